@@ -1,35 +1,90 @@
+import asyncio
+import html
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Literal
+
+import orjson
 
-from app.core.ai_agent import get_response_from_ai_agents
+from app.core.ai_agent import (
+    aclose_http_client,
+    get_response_from_ai_agents_async,
+    stream_response_from_ai_agents,
+    warm_up,
+)
 from app.config.settings import settings
 from app.common.logger import get_logger
 from app.common.custom_exception import CustomException
 
 logger = get_logger(__name__)
 
-app = FastAPI(title="Multi AI Agent LLMOPS API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Heavy imports and client construction happen off the event loop
+    await asyncio.to_thread(warm_up)
+    yield
+    await aclose_http_client()
+
+
+app = FastAPI(title="Multi AI Agent LLMOPS API", version="1.0.0", lifespan=lifespan)
+
+# Unknown models are rejected (422) by request validation, before any agent code runs
+ModelName = Literal[tuple(settings.ALLOWED_MODEL_NAMES)]
 
 class RequestState(BaseModel):
-    model_name: str
+    model_name: ModelName
     system_prompt: str
     messages: List[str]
     allow_search: bool = False
 
 
-@app.post("/chat")
-def chat_endpoint(request: RequestState):
+class ChatResponse(BaseModel):
+    response: str
+
+
+INDEX_HTML = Path(__file__).resolve().parents[1] / "frontend" / "index.html"
+
+
+@lru_cache(maxsize=1)
+def _render_index() -> str:
+    options = "".join(
+        f'<option value="{html.escape(name)}">{html.escape(name)}</option>'
+        for name in settings.ALLOWED_MODEL_NAMES
+    )
+    return INDEX_HTML.read_text(encoding="utf-8").replace("{{MODEL_OPTIONS}}", options)
+
+
+@app.get("/", response_class=HTMLResponse)
+async def index():
+    """
+    Serve the chat UI; it talks to /chat/stream from the same origin.
+    """
+    return _render_index()
+
+
+@app.get("/health")
+async def health():
+    """
+    Liveness probe; answers once startup (including warm-up) has finished.
+    """
+    return {"status": "ok"}
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(request: RequestState):
     """
     Endpoint to handle chat requests using multiple AI agents.
     """
     logger.info(f"Received chat request with model: {request.model_name}")
-    if request.model_name not in settings.ALLOWED_MODEL_NAMES:
-        logger.warning(f"Model {request.model_name} is invalid.")
-        raise HTTPException(status_code=400, detail="Invalid model name provided.")
     try:
         
-        response = get_response_from_ai_agents(
+        response = await get_response_from_ai_agents_async(
             request.model_name,
             request.messages,
             request.allow_search,
@@ -42,4 +97,39 @@ def chat_endpoint(request: RequestState):
         logger.error(f"CustomException occurred: {ce.message}")
         raise HTTPException(status_code=500, 
                             detail=str(CustomException("Failed to get AI response", error_detail=ce)))
-    
\ No newline at end of file
+
+
+def _sse(data, event: str = None) -> str:
+    """
+    Format one server-sent event. Data is JSON-encoded so newlines inside
+    tokens cannot break the framing.
+    """
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode()}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: RequestState):
+    """
+    Same as /chat, but streams the answer as server-sent events: one event per
+    text chunk, then an 'end' event (or an 'error' event if the agent fails).
+    """
+    logger.info(f"Received streaming chat request with model: {request.model_name}")
+
+    async def events():
+        try:
+            async for token in stream_response_from_ai_agents(
+                request.model_name,
+                request.messages,
+                request.allow_search,
+                request.system_prompt
+            ):
+                yield _sse(token)
+            logger.info(f"Successfully streamed response from AI agents {request.model_name}")
+            yield _sse({}, event="end")
+        except Exception as e:
+            # headers are already sent, so report the failure in-band
+            logger.exception("Streaming chat request failed")
+            yield _sse({"detail": str(CustomException("Failed to get AI response", error_detail=e))}, event="error")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -7,6 +7,11 @@ class Settings:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 
+    # Single process serving both the API and the web UI; loopback only unless
+    # APP_HOST says otherwise (the docker image sets 0.0.0.0)
+    APP_HOST = os.getenv("APP_HOST", "127.0.0.1")
+    APP_PORT = int(os.getenv("APP_PORT", "9999"))
+
     ALLOWED_MODEL_NAMES =[
         "llama-3.1-8b-instant",
         "llama-3.3-70b-versatile"
@@ -1,5 +1,13 @@
 # app/core/ai_agent.py
-from typing import Any, List, Dict, Optional
+import asyncio
+import atexit
+import importlib.util
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, singledispatch
+from typing import Any, AsyncIterator, List, Dict, Hashable, Optional, Tuple
 from app.config.settings import settings
 from app.common.logger import get_logger
 
@@ -12,61 +20,168 @@ try:
 except Exception:
     GroqBadRequestError = None  # type: ignore
 
+# Populated by the first successful _import_llm_components() call
+_COMPONENTS: Optional[Dict[str, Any]] = None
+
+# Module-level handles, bound to the real classes by _import_llm_components()
+# so hot paths use plain globals instead of dict lookups
+ChatGroq: Any = None
+TavilySearch: Any = None
+StateGraph: Any = None
+MessagesState: Any = None
+START: Any = None
+END: Any = None
+AIMessage: Any = None
+HumanMessage: Any = None
+ToolMessage: Any = None
+ChatPromptTemplate: Any = None
+RunnableConfig: Any = None
+
 def _import_llm_components() -> Dict[str, Any]:
     """
-    Lazy import of third-party LLM/tool libraries. Raises ImportError with a
-    clear message if required packages are missing or fail to import.
+    Lazy import of third-party LLM/tool libraries, done once per process.
+    Raises ImportError with a clear message if a required package is missing;
+    any other import-time failure propagates unchanged.
     """
+    global _COMPONENTS
+    if _COMPONENTS is not None:
+        return _COMPONENTS
+
     try:
         # These package names match how you referenced them in your code.
         # If pip install fails for any of these names, tell me the pip error.
         from langchain_groq import ChatGroq  # type: ignore
         from langchain_tavily import TavilySearch  # type: ignore
-        from langgraph.prebuilt import create_react_agent  # type: ignore
-        from langchain_core.messages import AIMessage, HumanMessage  # type: ignore
+        from langgraph.graph import END, START, MessagesState, StateGraph  # type: ignore
+        from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # type: ignore
         from langchain_core.prompts import ChatPromptTemplate  # type: ignore
-
-        return {
-            "ChatGroq": ChatGroq,
-            "TavilySearch": TavilySearch,
-            "create_react_agent": create_react_agent,
-            "AIMessage": AIMessage,
-            "HumanMessage": HumanMessage,
-            "ChatPromptTemplate": ChatPromptTemplate,
-        }
-    except Exception as e:
-        logger.exception("Failed to import LLM/tool libraries (langchain_groq/langchain_tavily/langgraph/langchain_core).")
+        from langchain_core.runnables import RunnableConfig  # type: ignore
+    except ModuleNotFoundError as e:
+        logger.error("Missing LLM/tool library: %s", e.name)
         raise ImportError(
-            "Missing or broken LLM/tool dependencies. Please install the required packages "
-            "(e.g. langchain_groq, langchain_tavily, langgraph, langchain_core) and restart. "
-            "See server logs for full import error."
+            f"Missing LLM/tool dependency '{e.name}'. Please install the required packages "
+            "(e.g. langchain_groq, langchain_tavily, langgraph, langchain_core) and restart."
         ) from e
 
+    _COMPONENTS = {
+        "ChatGroq": ChatGroq,
+        "TavilySearch": TavilySearch,
+        "StateGraph": StateGraph,
+        "MessagesState": MessagesState,
+        "START": START,
+        "END": END,
+        "AIMessage": AIMessage,
+        "HumanMessage": HumanMessage,
+        "ToolMessage": ToolMessage,
+        "ChatPromptTemplate": ChatPromptTemplate,
+        "RunnableConfig": RunnableConfig,
+    }
+    globals().update(_COMPONENTS)
+    return _COMPONENTS
+
+# Bounded TTL cache for Tavily results, shared by every CachedTavilySearch instance
+SEARCH_CACHE_MAXSIZE = 512
+SEARCH_CACHE_TTL = 300  # seconds; search results go stale
+_SEARCH_CACHE: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+def _search_cache_key(query: Any, kwargs: Dict[str, Any]) -> Hashable:
+    # normalize case/whitespace so trivially different queries share an entry
+    extra = tuple(sorted((k, repr(v)) for k, v in kwargs.items() if k != "run_manager" and v is not None))
+    return (" ".join(str(query).lower().split()), extra)
+
+def _search_cache_get(key: Hashable) -> Optional[Any]:
+    with _SEARCH_CACHE_LOCK:
+        entry = _SEARCH_CACHE.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _SEARCH_CACHE[key]
+            return None
+        _SEARCH_CACHE.move_to_end(key)
+        return value
+
+def _search_cache_put(key: Hashable, value: Any) -> None:
+    # TavilySearch reports API failures as {"error": ...} instead of raising; never cache those
+    if isinstance(value, dict) and "error" in value:
+        return
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic() + SEARCH_CACHE_TTL, value)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > SEARCH_CACHE_MAXSIZE:
+            _SEARCH_CACHE.popitem(last=False)
+
+@lru_cache(maxsize=1)
+def _cached_tavily_class() -> Any:
+    """
+    Build the CachedTavilySearch class on first use (TavilySearch itself is imported lazily).
+    """
+    _import_llm_components()
+
+    class CachedTavilySearch(TavilySearch):  # type: ignore[misc, valid-type]
+        """
+        TavilySearch that answers repeated queries from the in-process TTL cache.
+        """
+
+        def _run(self, query: str, **kwargs: Any) -> Any:
+            key = _search_cache_key(query, kwargs)
+            cached = _search_cache_get(key)
+            if cached is not None:
+                return cached
+            result = super()._run(query, **kwargs)
+            _search_cache_put(key, result)
+            return result
+
+        async def _arun(self, query: str, **kwargs: Any) -> Any:
+            key = _search_cache_key(query, kwargs)
+            cached = _search_cache_get(key)
+            if cached is not None:
+                return cached
+            result = await super()._arun(query, **kwargs)
+            _search_cache_put(key, result)
+            return result
+
+    return CachedTavilySearch
+
+# make_tools results per allow_search flag; only successful builds are stored
+_TOOLS_CACHE: Dict[bool, List[Any]] = {}
+
 def make_tools(allow_search: bool) -> List[Any]:
     """
     Build and return a list of tools for the agent.
     If allow_search is False, return an empty list.
+    The tool objects (and their search cache) are reused across requests.
     """
     if not allow_search:
         return []
+    if allow_search in _TOOLS_CACHE:
+        return _TOOLS_CACHE[allow_search]
+
+    if not settings.TAVILY_API_KEY:
+        # the key is read once at startup, so remembering [] also means we only log once
+        logger.warning("TAVILY_API_KEY is not set; web search is disabled")
+        _TOOLS_CACHE[allow_search] = []
+        return []
 
-    comps = _import_llm_components()
-    TavilySearch = comps["TavilySearch"]
+    CachedTavilySearch = _cached_tavily_class()
 
     try:
         # Example configuration for TavilySearch — adjust if your API expects different args
-        tavily_tool = TavilySearch(
+        tavily_tool = CachedTavilySearch(
             max_results=3,
             search_depth="advanced",
             include_answer=True,
             include_raw_content=False
         )
-        return [tavily_tool]
     except Exception as e:
         logger.exception("Failed to initialize TavilySearch tool")
         # Return empty list rather than failing hard — we'll fallback later if needed
         return []
 
+    _TOOLS_CACHE[allow_search] = [tavily_tool]
+    return _TOOLS_CACHE[allow_search]
+
 def _extract_failed_generation_from_groq(exc: Exception) -> str:
     """
     Try to extract the 'failed_generation' or a meaningful message from a Groq BadRequestError.
@@ -92,7 +207,18 @@ def _extract_failed_generation_from_groq(exc: Exception) -> str:
     except Exception:
         return str(exc)
 
-def _parse_agent_response(response: Any, AIMessage: Any) -> str:
+def _ai_content(m: Any) -> Optional[str]:
+    """
+    Content of m if it is an AI message (LangChain object or plain dict), else None.
+    """
+    if isinstance(m, AIMessage):
+        return m.content
+    # plain dict message (e.g. deserialized state)
+    if isinstance(m, dict) and m.get("type") in ("ai", "AIMessage"):
+        return m.get("content") or None
+    return None
+
+def _parse_agent_response(response: Any) -> str:
     """
     Convert whatever the agent returned into a single string.
     Expects 'response' to be an object/dict with 'messages' or similar structure.
@@ -112,101 +238,361 @@ def _parse_agent_response(response: Any, AIMessage: Any) -> str:
             # try last resort
             return str(response)
 
-        # collect contents from AIMessage instances or dicts
-        ai_texts: List[str] = []
-        for m in messages:
-            # If m is an AIMessage-like object
-            try:
-                if isinstance(m, AIMessage):
-                    ai_texts.append(m.content)
-                    continue
-            except Exception:
-                pass
-            # If m is a dict-like with 'content'
-            if isinstance(m, dict) and "content" in m:
-                ai_texts.append(m["content"])
-            else:
-                # fallback string conversion
-                ai_texts.append(str(getattr(m, "content", m)))
-        # prefer the last AI text
-        if ai_texts:
-            return ai_texts[-1]
-        return ""
+        # only the last AI message is used, so walk from the tail and stop at the first hit
+        return next((c for c in map(_ai_content, reversed(messages)) if c is not None), "")
     except Exception:
         logger.exception("Failed while parsing agent response")
         return str(response)
 
-def get_response_from_ai_agents(llm_id: str, query: Any, allow_search: bool, system_prompt: str) -> str:
+# Tools whose bulky results are collapsed once the model has moved past them
+COLLAPSE_TOOLS = frozenset({"tavily_search"})
+# How much of a collapsed result is kept when it has no 'answer' field
+COLLAPSED_SNIPPET_CHARS = 300
+
+def _summarize_tool_result(m: Any) -> str:
     """
-    Main entrypoint used by your API. Returns a single string response from the configured agent.
-    Behavior:
-    - Tries to call the agent with tools (if allow_search True).
-    - If Groq tool call fails (BadRequestError / tool_use_failed), logs details and retries WITHOUT tools.
-    - Raises ImportError if LLM/tool packages are not installed.
-    - Raises other exceptions if both primary and fallback fail.
+    One-line stand-in for a collapsed tool result. Tavily results carry a short
+    'answer' (include_answer=True), which is kept together with the query; other
+    content is cut down to a snippet.
+    """
+    try:
+        data = json.loads(m.content) if isinstance(m.content, str) else None
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and data.get("answer"):
+        return f"[collapsed {m.name} result for {data.get('query', '')!r}] {data['answer']}"
+    return f"[collapsed {m.name} result] {str(m.content)[:COLLAPSED_SNIPPET_CHARS]}"
+
+def _collapse_tool_messages(messages: List[Any], collapse_tools: frozenset = COLLAPSE_TOOLS) -> List[Any]:
+    """
+    Reduce every collapse_tools result from an earlier round to its one-line
+    summary (query + answer). With one search per round, consecutive rounds
+    would otherwise resend each earlier payload in full. The latest run of tool
+    results is kept whole (the model has not seen it yet).
+    Collapsed results stay ToolMessages so every tool_call_id still has an answer,
+    which the Groq API requires.
+    """
+    # start of the trailing run of tool results
+    latest_run = len(messages)
+    while latest_run > 0 and isinstance(messages[latest_run - 1], ToolMessage):
+        latest_run -= 1
+
+    collapsed: List[Any] = []
+    changed = False
+    for i, m in enumerate(messages):
+        if i < latest_run and isinstance(m, ToolMessage) and m.name in collapse_tools:
+            m = m.model_copy(update={"content": _summarize_tool_result(m)})
+            changed = True
+        collapsed.append(m)
+    return collapsed if changed else messages
+
+async def _run_tool_calls(tool_calls: List[Dict[str, Any]], tools_by_name: Dict[str, Any], config: Any = None) -> List[Any]:
+    """
+    Execute every tool call from one model turn concurrently, so independent
+    searches cost max(latency) instead of sum(latency). Failures come back as
+    error ToolMessages for the model to see instead of aborting the run.
+    config is the calling node's RunnableConfig, passed on so callbacks reach the tools.
+    """
+    async def _call(call: Dict[str, Any]) -> Any:
+        tool = tools_by_name.get(call["name"])
+        if tool is None:
+            return ToolMessage(content=f"Error: unknown tool {call['name']}",
+                               tool_call_id=call["id"], name=call["name"], status="error")
+        try:
+            # invoking with the full ToolCall makes the tool return a ToolMessage
+            return await tool.ainvoke(call, config)
+        except Exception as e:
+            logger.exception("Tool %s failed", call["name"])
+            return ToolMessage(content=f"Error: {e}", tool_call_id=call["id"], name=call["name"], status="error")
+
+    return list(await asyncio.gather(*[_call(c) for c in tool_calls]))
+
+def _build_agent(llm: Any, tools_list: List[Any], prompt: Any) -> Any:
+    """
+    Compile the agent graph: an 'agent' node plans (emits tool calls) and later
+    synthesizes the answer, and a 'tools' node fans the planned calls out in
+    parallel. Same loop as langgraph's prebuilt react agent, but tool calls
+    never run one after another.
+    """
+    _import_llm_components()
+
+    if not tools_list:
+        model = llm
+    elif len(tools_list) == 1:
+        # a lone tool gains little from parallel calls and Groq tends to emit
+        # redundant ones; each extra call is another round of tokens and latency
+        model = llm.bind_tools(tools_list, parallel_tool_calls=False)
+    else:
+        model = llm.bind_tools(tools_list)
+    if prompt is not None:
+        model = prompt | model
+    tools_by_name = {t.name: t for t in tools_list}
+
+    # Nodes pass their config on explicitly: before Python 3.11 it is not carried
+    # through contextvars, and without it astream_events sees no model tokens.
+    async def agent_node(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        # the model sees collapsed history; the stored state keeps full results
+        messages = _collapse_tool_messages(state["messages"])
+        if prompt is not None:
+            response = await model.ainvoke({"messages": messages}, config)
+        else:
+            response = await model.ainvoke(messages, config)
+        return {"messages": [response]}
+
+    async def tools_node(state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        tool_calls = state["messages"][-1].tool_calls
+        return {"messages": await _run_tool_calls(tool_calls, tools_by_name, config)}
+
+    def route(state: Dict[str, Any]) -> str:
+        last = state["messages"][-1]
+        return "tools" if tools_list and getattr(last, "tool_calls", None) else END
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("agent", agent_node)
+    graph.add_node("tools", tools_node)
+    graph.add_edge(START, "agent")
+    graph.add_conditional_edges("agent", route, ["tools", END])
+    graph.add_edge("tools", "agent")
+    return graph.compile()
+
+# One keep-alive connection pool shared by every ChatGroq instance
+_HTTP_ASYNC_CLIENT: Any = None
+
+def _http_async_client() -> Any:
+    """
+    Return the shared httpx.AsyncClient, creating it on first use. HTTP/2 is only
+    enabled when the optional 'h2' package is installed.
+    """
+    global _HTTP_ASYNC_CLIENT
+    if _HTTP_ASYNC_CLIENT is None:
+        import httpx  # installed with the groq client
+
+        _HTTP_ASYNC_CLIENT = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=30.0
+        )
+    return _HTTP_ASYNC_CLIENT
+
+async def aclose_http_client() -> None:
+    """
+    Close the shared HTTP client. Its pooled connections belong to the event loop
+    that opened them, so async callers outside the API (which closes it on
+    shutdown) should await this before their loop ends. The sync wrapper does this
+    for its background loop at interpreter exit.
     """
-    comps = _import_llm_components()
-    ChatGroq = comps["ChatGroq"]
-    create_react_agent = comps["create_react_agent"]
-    AIMessage = comps["AIMessage"]
-    HumanMessage = comps["HumanMessage"]
-    ChatPromptTemplate = comps["ChatPromptTemplate"]
+    global _HTTP_ASYNC_CLIENT
+    if _HTTP_ASYNC_CLIENT is not None:
+        await _HTTP_ASYNC_CLIENT.aclose()
+        _HTTP_ASYNC_CLIENT = None
+        # cached models hold the closed client; rebuild them if the app starts again
+        _cached_llm.cache_clear()
+        _compiled_agent.cache_clear()
 
-    # instantiate model
+@lru_cache(maxsize=32)
+def _cached_llm(llm_id: str) -> Any:
+    """
+    Return a ChatGroq client for llm_id, built once and reused across requests.
+    All models share one async connection pool.
+    """
+    _import_llm_components()
     try:
-        llm = ChatGroq(model=llm_id)
+        return ChatGroq(model=llm_id, http_async_client=_http_async_client())
     except Exception:
         logger.exception("Failed to instantiate ChatGroq model with id: %s", llm_id)
         raise
 
-    # prepare prompt template (simple two-part prompt: system + placeholder for messages)
+@lru_cache(maxsize=32)
+def _cached_prompt(system_prompt: str) -> Any:
+    """
+    Return the prompt template for system_prompt (simple two-part prompt:
+    system + placeholder for messages), or None if it cannot be built.
+    """
+    _import_llm_components()
     try:
-        prompt = ChatPromptTemplate.from_messages([
+        return ChatPromptTemplate.from_messages([
             ("system", system_prompt or settings.DEFAULT_SYSTEM_PROMPT),
             ("placeholder", "{messages}")
         ])
     except Exception:
         logger.exception("Failed to build ChatPromptTemplate")
         # fallback: proceed without template (some versions may not need it)
-        prompt = None
+        return None
 
-    # create tools (may be [])
-    tools = make_tools(allow_search)
+def _cached_agent(llm_id: str, allow_search: bool, system_prompt: str) -> Any:
+    """
+    Return the agent for the given configuration. Model, prompt, tools and
+    the compiled agent graph are all reused, so steady-state requests only pay
+    for the agent invocation itself.
+    If search was asked for but no tools could be built, the tool-less agent is
+    returned instead, so nothing tool-less is cached under the search key and a
+    later request retries make_tools.
+    """
+    if allow_search and not make_tools(allow_search):
+        allow_search = False
+    return _compiled_agent(llm_id, allow_search, system_prompt)
 
-    def _build_agent(tools_list: List[Any]):
-        try:
-            return create_react_agent(
-                model=llm,
-                tools=tools_list,
-                prompt=prompt
-            )
-        except Exception:
-            logger.exception("Failed to create react agent (tools count=%d)", len(tools_list))
-            raise
+@lru_cache(maxsize=32)
+def _compiled_agent(llm_id: str, allow_search: bool, system_prompt: str) -> Any:
+    tools_list = make_tools(allow_search)
+    try:
+        return _build_agent(_cached_llm(llm_id), tools_list, _cached_prompt(system_prompt))
+    except Exception:
+        logger.exception("Failed to create agent (tools count=%d)", len(tools_list))
+        raise
+
+def warm_up() -> None:
+    """
+    Pre-import the LLM/tool libraries and build a ChatGroq client for every allowed
+    model. Blocking; meant to be run off the event loop at API startup so the first
+    request does not stall it.
+    """
+    try:
+        _import_llm_components()
+        for llm_id in settings.ALLOWED_MODEL_NAMES:
+            _cached_llm(llm_id)
+    except Exception:
+        # Not fatal: the request path raises the same error with full context
+        logger.exception("Agent warm-up failed")
 
-    # Build agent with initial tool set
-    agent = _build_agent(tools)
+def _check_model(llm_id: str) -> None:
+    """
+    Reject unknown models before any heavy import or client construction (and
+    before a garbage id can land in the agent caches).
+    """
+    if llm_id not in settings.ALLOWED_MODEL_NAMES:
+        raise ValueError(f"Model {llm_id!r} is not allowed; choose one of {settings.ALLOWED_MODEL_NAMES}")
 
-    # Normalize messages into list of HumanMessage
-    if isinstance(query, str):
-        query_msgs = [HumanMessage(content=query)]
-    elif isinstance(query, list):
-        query_msgs = [HumanMessage(content=q) if not isinstance(q, HumanMessage) else q for q in query]
-    else:
-        # best-effort convert to string
-        query_msgs = [HumanMessage(content=str(query))]
+@singledispatch
+def _to_human_messages(query: Any) -> List[Any]:
+    """
+    Normalize a query into a list of HumanMessage, dispatching on the query type.
+    Requires _import_llm_components() to have run.
+    """
+    # best-effort convert to string
+    return [HumanMessage(content=str(query))]
 
-    state = {"messages": query_msgs}
+@_to_human_messages.register
+def _(query: str) -> List[Any]:
+    return [HumanMessage(content=query)]
+
+@_to_human_messages.register
+def _(query: list) -> List[Any]:
+    return [q if isinstance(q, HumanMessage) else HumanMessage(content=q) for q in query]
+
+def _build_state(query: Any) -> Dict[str, Any]:
+    """
+    Wrap the user query into the initial agent state.
+    """
+    _import_llm_components()
+    return {"messages": _to_human_messages(query)}
+
+async def get_response_from_ai_agents_async(llm_id: str, query: Any, allow_search: bool, system_prompt: str) -> str:
+    """
+    Main entrypoint used by your API. Returns a single string response from the configured agent.
+    Behavior:
+    - Tries to call the agent with tools (if allow_search True).
+    - If Groq tool call fails (BadRequestError / tool_use_failed), logs details and retries WITHOUT tools.
+    - Raises ValueError if llm_id is not in settings.ALLOWED_MODEL_NAMES.
+    - Raises ImportError if LLM/tool packages are not installed.
+    - Raises other exceptions if both primary and fallback fail.
+    """
+    _check_model(llm_id)
+    state = _build_state(query)
 
     # Try invoking agent (primary attempt)
     try:
-        response = agent.invoke(state)
+        response = await _cached_agent(llm_id, allow_search, system_prompt).ainvoke(state)
         # parse response to text
-        return _parse_agent_response(response, AIMessage)
+        return _parse_agent_response(response)
     except Exception as exc:
         # If it's a Groq tool failure and we have the Groq exception type, extract helpful info
         if GroqBadRequestError is not None and isinstance(exc, GroqBadRequestError):
             failed_info = _extract_failed_generation_from_groq(exc)
             logger.error("Groq BadRequestError during tool call. failed_generation: %s", failed_info, exc_info=True)
 
-            # Attempt
+            # Attempt the same query again without tools
+            if allow_search:
+                logger.info("Retrying request without tools (model=%s)", llm_id)
+                response = await _cached_agent(llm_id, False, system_prompt).ainvoke(state)
+                return _parse_agent_response(response)
+        raise
+
+# Long-lived loop (in a daemon thread) that runs every sync call, so the shared
+# HTTP client and the cached models/agents stay bound to a single loop
+_SYNC_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SYNC_LOOP_LOCK = threading.Lock()
+
+def _close_sync_loop() -> None:
+    """
+    atexit hook: close the shared HTTP client on the sync loop, then stop it.
+    """
+    loop = _SYNC_LOOP
+    if loop is None or not loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_http_client(), loop).result(timeout=5)
+    except Exception:
+        logger.exception("Failed to close HTTP client on exit")
+    loop.call_soon_threadsafe(loop.stop)
+
+def _sync_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the background event loop for sync callers, starting it on first use.
+    """
+    global _SYNC_LOOP
+    with _SYNC_LOOP_LOCK:
+        if _SYNC_LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="ai-agent-sync-loop", daemon=True).start()
+            atexit.register(_close_sync_loop)
+            _SYNC_LOOP = loop
+    return _SYNC_LOOP
+
+def get_response_from_ai_agents(llm_id: str, query: Any, allow_search: bool, system_prompt: str) -> str:
+    """
+    Synchronous wrapper around get_response_from_ai_agents_async for legacy callers
+    (scripts, notebooks). Blocks until the answer is ready. Every call runs on the
+    same background loop, so the shared HTTP client, the ChatGroq clients and the
+    compiled agents are reused across calls.
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        get_response_from_ai_agents_async(llm_id, query, allow_search, system_prompt),
+        _sync_loop()
+    )
+    return future.result()
+
+async def _stream_agent_tokens(agent: Any, state: Dict[str, Any]) -> AsyncIterator[str]:
+    async for event in agent.astream_events(state, version="v2"):
+        if event["event"] != "on_chat_model_stream":
+            continue
+        content = event["data"]["chunk"].content
+        # tool-call turns stream empty (or non-text) content; only forward text
+        if content and isinstance(content, str):
+            yield content
+
+async def stream_response_from_ai_agents(llm_id: str, query: Any, allow_search: bool, system_prompt: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of get_response_from_ai_agents_async: yields answer text as the
+    model generates it.
+    Falls back to a run WITHOUT tools on a Groq tool failure, as long as no text
+    has been sent yet.
+    """
+    _check_model(llm_id)
+    state = _build_state(query)
+    sent_any = False
+    try:
+        async for token in _stream_agent_tokens(_cached_agent(llm_id, allow_search, system_prompt), state):
+            sent_any = True
+            yield token
+    except Exception as exc:
+        if GroqBadRequestError is not None and isinstance(exc, GroqBadRequestError):
+            failed_info = _extract_failed_generation_from_groq(exc)
+            logger.error("Groq BadRequestError during tool call. failed_generation: %s", failed_info, exc_info=True)
+
+            if allow_search and not sent_any:
+                logger.info("Retrying streamed request without tools (model=%s)", llm_id)
+                async for token in _stream_agent_tokens(_cached_agent(llm_id, False, system_prompt), state):
+                    yield token
+                return
+        raise
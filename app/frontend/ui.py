@@ -1,5 +1,5 @@
+import orjson
 import streamlit as st
-import requests
 
 from app.config.settings import settings
 from app.common.logger import get_logger
@@ -7,6 +7,48 @@ from app.common.custom_exception import CustomException
 
 logger = get_logger(__name__)
 
+
+@st.cache_resource
+def _session():
+    """
+    One pooled keep-alive session per Streamlit server, shared across reruns.
+    requests is only imported the first time the agent is actually asked.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    ))
+    s.headers.update({"Connection": "keep-alive"})
+    return s
+
+
+def _iter_agent_stream(response):
+    """
+    Yield text chunks from the backend's server-sent event stream.
+    Raises RuntimeError if the backend reports an error mid-stream.
+    """
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            # blank line ends an event
+            event = None
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data = orjson.loads(line[len("data:"):])
+            if event == "error":
+                raise RuntimeError(data.get("detail", "Backend failed while streaming"))
+            if event == "end":
+                return
+            yield data
+
+
 st.set_page_config(page_title="Multi AI Agent", layout="centered")
 st.title("Multi AI Agent using Groq and Tavily New")
 
@@ -17,9 +59,10 @@ allow_web_search = st.checkbox("Allow web search")
 
 user_query = st.text_area("Enter your query : ", height=150)
 
-API_URL = "http://127.0.0.1:9999/chat"
+API_URL = "http://127.0.0.1:9999/chat/stream"
 
 if st.button("Ask Agent") and user_query.strip():
+    import requests
 
     payload = {
         "model_name": selected_model,
@@ -30,25 +73,23 @@ if st.button("Ask Agent") and user_query.strip():
 
     try:
         logger.info("Sending request to backend")
-        # add short timeout to fail fast if backend is down
-        response = requests.post(API_URL, json=payload, timeout=8)
-
-        if response.status_code == 200:
-            # be defensive parsing JSON
-            try:
-                data = response.json()
-            except Exception:
-                logger.error("Backend returned non-JSON response: %s", response.text)
-                st.error("Backend returned invalid response (non-JSON). See logs for details.")
-            else:
-                agent_response = data.get("response", "")
-                logger.info("Successfully received response from backend")
+        # short connect timeout to fail fast if backend is down; the read timeout
+        # covers the gap between chunks (e.g. while a web search runs)
+        with _session().post(
+            API_URL,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=(8, 60),
+            stream=True
+        ) as response:
+            if response.status_code == 200:
                 st.subheader("Agent Response")
-                st.markdown(agent_response.replace("\n", "<br>"), unsafe_allow_html=True)
-        else:
-            # log status and body to help debugging
-            logger.error("Backend returned error: %s - %s", response.status_code, response.text)
-            st.error(f"Backend Error: {response.status_code} — see logs for details")
+                st.write_stream(_iter_agent_stream(response))
+                logger.info("Successfully received response from backend")
+            else:
+                # log status and body to help debugging
+                logger.error("Backend returned error: %s - %s", response.status_code, response.text)
+                st.error(f"Backend Error: {response.status_code} — see logs for details")
 
     except requests.exceptions.RequestException as req_e:
         # network-related exceptions (ConnectionError, Timeout, etc.)
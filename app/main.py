@@ -1,38 +1,24 @@
-import subprocess
-import threading
-import time
-from dotenv import load_dotenv
+import uvicorn
+from app.config.settings import settings
 from app.common.logger import get_logger
 from app.common.custom_exception import CustomException
 
 logger = get_logger(__name__)
 
-load_dotenv()
-
-def run_backend():
-    try:
-        logger.info("Starting backend service..")
-        subprocess.run(
-            ["uvicorn", "app.backend.api:app", "--host", "127.0.0.1", "--port", "9999"],
-            check=True
-        )
-    except Exception as e:     # FIX: catch real errors
-        logger.exception("Backend crashed")
-        raise CustomException("Failed to start backend", error_detail=e)
-
-def run_frontend():
+def run_app():
+    """
+    Serve the API and the web UI (GET /) from this process: one interpreter and
+    one copy of the LLM libraries instead of separate uvicorn and streamlit children.
+    """
     try:
-        logger.info("Starting frontend service..")
-        subprocess.run(["streamlit", "run", "app/frontend/ui.py"], check=True)
-    except Exception as e:    # FIX: catch real errors
-        logger.exception("Frontend crashed")
-        raise CustomException("Failed to start frontend", error_detail=e)
+        logger.info("Starting app on %s:%s..", settings.APP_HOST, settings.APP_PORT)
+        uvicorn.run("app.backend.api:app", host=settings.APP_HOST, port=settings.APP_PORT)
+    except Exception as e:
+        logger.exception("App crashed")
+        raise CustomException("Failed to start app", error_detail=e)
 
 if __name__ == "__main__":
     try:
-        t = threading.Thread(target=run_backend, daemon=True)
-        t.start()
-        time.sleep(2)
-        run_frontend()
+        run_app()
     except Exception as e:
         logger.exception(f"Exception occurred: {e}")
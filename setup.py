@@ -8,5 +8,6 @@ setup(
     version="0.1",
     author="Sudhanshu",
     packages=find_packages(),
+    package_data={"app.frontend": ["index.html"]},
     install_requires = requirements,
 )